@@ -1,38 +1,85 @@
 #!/usr/bin/python3
 
-from glob import glob
-from io import StringIO
-from os import makedirs
+from re import compile as re_compile
+from string import Formatter
+from os import makedirs, scandir
 from traceback import format_exc
 from sys import argv, exit, stderr
 from os.path import join, isdir, exists, dirname
 
-_VALID_I2C = [
-    "I2C0_SDA",
-    "I2C0_SCL",
-    "I2C1_SDA",
-    "I2C1_SCL",
-]
-_VALID_SPI = [
-    "SPI0_RX",
-    "SPI0_CS",
-    "SPI0_SCK",
-    "SPI0_TX",
-    "SPI1_RX",
-    "SPI1_CS",
-    "SPI1_SCK",
-    "SPI1_TX",
-]
-_VALID_UART = [
-    "UART0_TX",
-    "UART0_RX",
-    "UART0_CTS",
-    "UART0_RTS",
-    "UART1_TX",
-    "UART1_RX",
-    "UART1_CTS",
-    "UART1_RTS",
-]
+_ROLE_I2C0_SDA = 0x1
+_ROLE_I2C0_SCL = 0x2
+_ROLE_I2C1_SDA = 0x4
+_ROLE_I2C1_SCL = 0x8
+_ROLE_SPI0_RX = 0x10
+_ROLE_SPI0_CS = 0x20
+_ROLE_SPI0_SCK = 0x40
+_ROLE_SPI0_TX = 0x80
+_ROLE_SPI1_RX = 0x100
+_ROLE_SPI1_CS = 0x200
+_ROLE_SPI1_SCK = 0x400
+_ROLE_SPI1_TX = 0x800
+_ROLE_UART0_TX = 0x1000
+_ROLE_UART0_RX = 0x2000
+_ROLE_UART0_CTS = 0x4000
+_ROLE_UART0_RTS = 0x8000
+_ROLE_UART1_TX = 0x10000
+_ROLE_UART1_RX = 0x20000
+_ROLE_UART1_CTS = 0x40000
+_ROLE_UART1_RTS = 0x80000
+_ROLE_I2C = 0xF
+_ROLE_SPI = 0xFF0
+_ROLE_UART = 0xFF000
+_ROLES = {
+    "I2C0_SDA": (_ROLE_I2C0_SDA, _ROLE_I2C),
+    "I2C0_SCL": (_ROLE_I2C0_SCL, _ROLE_I2C),
+    "I2C1_SDA": (_ROLE_I2C1_SDA, _ROLE_I2C),
+    "I2C1_SCL": (_ROLE_I2C1_SCL, _ROLE_I2C),
+    "SPI0_RX": (_ROLE_SPI0_RX, _ROLE_SPI),
+    "SPI0_CS": (_ROLE_SPI0_CS, _ROLE_SPI),
+    "SPI0_SCK": (_ROLE_SPI0_SCK, _ROLE_SPI),
+    "SPI0_TX": (_ROLE_SPI0_TX, _ROLE_SPI),
+    "SPI1_RX": (_ROLE_SPI1_RX, _ROLE_SPI),
+    "SPI1_CS": (_ROLE_SPI1_CS, _ROLE_SPI),
+    "SPI1_SCK": (_ROLE_SPI1_SCK, _ROLE_SPI),
+    "SPI1_TX": (_ROLE_SPI1_TX, _ROLE_SPI),
+    "UART0_TX": (_ROLE_UART0_TX, _ROLE_UART),
+    "UART0_RX": (_ROLE_UART0_RX, _ROLE_UART),
+    "UART0_CTS": (_ROLE_UART0_CTS, _ROLE_UART),
+    "UART0_RTS": (_ROLE_UART0_RTS, _ROLE_UART),
+    "UART1_TX": (_ROLE_UART1_TX, _ROLE_UART),
+    "UART1_RX": (_ROLE_UART1_RX, _ROLE_UART),
+    "UART1_CTS": (_ROLE_UART1_CTS, _ROLE_UART),
+    "UART1_RTS": (_ROLE_UART1_RTS, _ROLE_UART),
+}
+_RX_STRICT = re_compile(r"[A-Za-z][A-Za-z0-9_-]+")
+_RX_REGULAR = re_compile(r"[A-Za-z0-9_\- \[\]|{}()@]{2,}")
+_RX_ROLE_SEP = re_compile(r"\s*[, ]\s*")
+_IN1 = "    "
+_IN2 = "        "
+_TOK_PWM = tuple(f" => PwmID::Pwm{x >> 1}{'AB'[x & 1]},\n" for x in range(0x10))
+_TOK_DOC = _IN1 + "/// "
+_TOK_ENUM = _IN1 + "Pin"
+_TOK_ENUM_HEX = " = 0x"
+_TOK_ENUM_END = "u8,\n"
+_TOK_PAIR_END = ") => (),\n"
+_TOK_SOME_END = ")) => (),\n"
+_TOK_I2C0 = " => I2cID::I2C0,\n"
+_TOK_I2C0_PAIR = _IN2 + "(I2cID::I2C0, "
+_TOK_I2C1 = " => I2cID::I2C1,\n"
+_TOK_I2C1_PAIR = _IN2 + "(I2cID::I2C1, "
+_TOK_SPI0 = " => SpiID::Spi0,\n"
+_TOK_SPI0_PAIR = _IN2 + "(SpiID::Spi0, "
+_TOK_SPI0_SOME = _IN2 + "(SpiID::Spi0, Some("
+_TOK_SPI1 = " => SpiID::Spi1,\n"
+_TOK_SPI1_PAIR = _IN2 + "(SpiID::Spi1, "
+_TOK_SPI1_SOME = _IN2 + "(SpiID::Spi1, Some("
+_TOK_UART0 = " => UartID::Uart0,\n"
+_TOK_UART0_PAIR = _IN2 + "(UartID::Uart0, "
+_TOK_UART0_SOME = _IN2 + "(UartID::Uart0, Some("
+_TOK_UART1 = " => UartID::Uart1,\n"
+_TOK_UART1_PAIR = _IN2 + "(UartID::Uart1, "
+_TOK_UART1_SOME = _IN2 + "(UartID::Uart1, Some("
 
 CODE = """// AUTOMATICALLY GENERATED: DO NOT EDIT!
 //
@@ -49,8 +96,7 @@ use core::option::Option::{{self, None, Some}};
 use crate::pin::pwm::PwmID;
 use crate::pin::{{I2cID, SpiID, UartID}};
 
-/// Pins for "{name}"{pins}
-{pwm}{i2c}{spi}{uart}
+/// Pins for "{name}"
 """
 CODE_LIB = """// AUTOMATICALLY GENERATED: DO NOT EDIT!
 //
@@ -64,7 +110,7 @@ CODE_PWM = """
 #[inline]
 pub(crate) fn pins_pwm(pin: &PinID) -> PwmID {{
     match pin {{
-{pins}}}
+{pwm}}}
 }}"""
 CODE_I2C = """
 #[inline]
@@ -121,60 +167,70 @@ pub(crate) fn pins_uart(tx: &PinID, rx: &PinID, cts: Option<&PinID>, rts: Option
     }}
     Some(d)
 }}"""
-CODE_PINS = """
-#[repr(u8)]
+CODE_PINS = """#[repr(u8)]
 pub enum PinID {{
-{pins}}}"""
+{pins}}}
+"""
+
+
+def _compile_template(s):
+    r, b = list(), list()
+    for v, n, _, _ in Formatter().parse(s):
+        b.append(v)
+        if n is None:
+            continue
+        r.append(("".join(b), n))
+        b.clear()
+    if len(b) > 0:
+        r.append(("".join(b), None))
+    return r
+
+
+_DEVICE = _compile_template(
+    CODE + CODE_PINS + CODE_PWM + CODE_I2C + CODE_SPI + CODE_UART + "\n"
+)
 
 
 class Pin(object):
-    __slots__ = ("id", "doc", "roles")
+    __slots__ = ("id", "id_str", "doc", "tok", "hex", "roles_mask")
 
     def __init__(self, id, doc, roles):
         self.id = id
+        self.id_str = str(id)
+        self.tok = "PinID::Pin" + self.id_str
+        self.hex = f"{id:X}"
         if len(doc) > 0:
             self.doc = doc.copy()
         else:
             self.doc = None
-        self.roles = list()
+        self.roles_mask = 0
         if not isinstance(roles, list):
             return
-        i, s, u = 0, 0, 0
+        c = 0
         for r in roles:
             if len(r) == 0:
                 continue
             v = r.upper()
-            self.roles.append(v)
-            if v in _VALID_I2C:
-                i += 1
-                continue
-            if v in _VALID_SPI:
-                s += 1
-                continue
-            if v in _VALID_UART:
-                u += 1
-                continue
-            raise ValueError(f'pin "{id}" has an invalid role "{v}"')
-        if i > 1:
+            e = _ROLES.get(v)
+            if e is None:
+                raise ValueError(f'pin "{id}" has an invalid role "{v}"')
+            if self.roles_mask & e[1]:
+                c |= e[1]
+            self.roles_mask |= e[0]
+        # Invalid roles take precedence over bus conflicts.
+        if c & _ROLE_I2C:
             raise ValueError(f'pin "{id}" can only have a single I2C role')
-        if s > 1:
+        if c & _ROLE_SPI:
             raise ValueError(f'pin "{id}" can only have a single SPI role')
-        if u > 1:
+        if c & _ROLE_UART:
             raise ValueError(f'pin "{id}" can only have a single UART role')
-        del i, s, u
 
     def __str__(self):
-        return f"PinID::Pin{self.id}"
-
-
-def _in(n):
-    return "    " * n
+        return self.tok
 
 
 def _name(v):
     for x in range(0, len(v)):
-        if len(v[x]) == 0:
-            continue
         if v[x].startswith("//"):
             continue
         if v[x].startswith("#") or ":" in v[x]:
@@ -184,9 +240,11 @@ def _name(v):
 
 
 def parse(file):
-    with open(file) as f:
-        d = [i.strip() for i in f.read().split("\n")]
-    if len(d) <= 4:
+    with open(file, "rb") as f:
+        b = f.read()
+    # Only split on "\n", "\r" and "\r\n", like a text-mode read.
+    d = [i for i in (k.decode("UTF-8").strip() for k in b.splitlines()) if i]
+    if len(d) < 3:
         raise ValueError(f'file "{file}" content is invalid')
     n, i = _name(d)
     if not _check_ascii(n):
@@ -197,7 +255,6 @@ def parse(file):
     p = _pins(d, i)
     if len(p) == 0:
         raise ValueError("no pin entries found")
-    del d, i
     p.sort(key=lambda x: x.id)
     return (n, t.lower(), p)
 
@@ -206,8 +263,6 @@ def _tag(v, start):
     if start >= len(v):
         raise ValueError("#<tag> entry was not found")
     for x in range(start, len(v)):
-        if len(v[x]) == 0:
-            continue
         if v[x].startswith("//"):
             continue
         if v[x].startswith("#") and len(v[x]) >= 4:
@@ -217,88 +272,97 @@ def _tag(v, start):
     raise ValueError("#<tag> entry was not found")
 
 
-def _make_pwm(pins):
-    a = StringIO()
-    try:
-        for i in pins:
-            v = int(i.id / 2) & 0x7
-            a.write(f"{_in(2)}PinID::Pin{i.id} => PwmID::Pwm{v}")
-            del v
-            if i.id % 2 == 0:
-                a.write("A,\n")
-            else:
-                a.write("B,\n")
-        a.write(_in(1))
-        return CODE_PWM.format(pins=a.getvalue())
-    finally:
-        a.close()
-        del a
-
-
-def _make_i2c(pins):
-    a, b = StringIO(), StringIO()
-    try:
-        for i in pins:
-            if "I2C0_SDA" in i.roles:
-                a.write(f"{_in(2)}PinID::Pin{i.id} => I2cID::I2C0,\n")
-            if "I2C1_SDA" in i.roles:
-                a.write(f"{_in(2)}PinID::Pin{i.id} => I2cID::I2C1,\n")
-            if "I2C0_SCL" in i.roles:
-                b.write(f"{_in(2)}(I2cID::I2C0, PinID::Pin{i.id}) => (),\n")
-            if "I2C1_SCL" in i.roles:
-                b.write(f"{_in(2)}(I2cID::I2C1, PinID::Pin{i.id}) => (),\n")
-        a.write(_in(2))
-        b.write(_in(2))
-        return CODE_I2C.format(i2c_sda=a.getvalue(), i2c_scl=b.getvalue())
-    finally:
-        a.close()
-        b.close()
-        del a, b
-
-
-def _make_spi(pins):
-    a, b, c, d = StringIO(), StringIO(), StringIO(), StringIO()
-    try:
-        for i in pins:
-            if "SPI0_TX" in i.roles:
-                a.write(f"{_in(2)}PinID::Pin{i.id} => SpiID::Spi0,\n")
-            if "SPI1_TX" in i.roles:
-                a.write(f"{_in(2)}PinID::Pin{i.id} => SpiID::Spi1,\n")
-            if "SPI0_SCK" in i.roles:
-                b.write(f"{_in(2)}(SpiID::Spi0, PinID::Pin{i.id}) => (),\n")
-            if "SPI1_SCK" in i.roles:
-                b.write(f"{_in(2)}(SpiID::Spi1, PinID::Pin{i.id}) => (),\n")
-            if "SPI0_RX" in i.roles:
-                c.write(f"{_in(2)}(SpiID::Spi0, Some(PinID::Pin{i.id})) => (),\n")
-            if "SPI1_RX" in i.roles:
-                c.write(f"{_in(2)}(SpiID::Spi1, Some(PinID::Pin{i.id})) => (),\n")
-            if "SPI0_CS" in i.roles:
-                d.write(f"{_in(2)}(SpiID::Spi0, Some(PinID::Pin{i.id})) => (),\n")
-            if "SPI1_CS" in i.roles:
-                d.write(f"{_in(2)}(SpiID::Spi1, Some(PinID::Pin{i.id})) => (),\n")
-        a.write(_in(2))
-        b.write(_in(2))
-        c.write(_in(2))
-        d.write(_in(2))
-        return CODE_SPI.format(
-            spi_tx=a.getvalue(),
-            spi_scl=b.getvalue(),
-            spi_rx=c.getvalue(),
-            spi_cs=d.getvalue(),
-        )
-    finally:
-        a.close()
-        b.close()
-        c.close()
-        d.close()
-        del a, b, c, d
+def _emit_all(name, tag, pins):
+    pwm, pid = list(), list()
+    i2c_sda, i2c_scl = list(), list()
+    spi_tx, spi_scl, spi_rx, spi_cs = list(), list(), list(), list()
+    uart_tx, uart_rx, uart_cts, uart_rts = list(), list(), list(), list()
+    for i in pins:
+        pwm.append(_IN2 + i.tok + _TOK_PWM[i.id & 0xF])
+        if isinstance(i.doc, list) and len(i.doc) > 0:
+            for v in i.doc:
+                pid.append(_TOK_DOC + v + "\n")
+        pid.append(_TOK_ENUM + i.id_str + _TOK_ENUM_HEX + i.hex + _TOK_ENUM_END)
+        if i.roles_mask == 0:
+            continue
+        m = i.roles_mask & _ROLE_I2C
+        if m == _ROLE_I2C0_SDA:
+            i2c_sda.append(_IN2 + i.tok + _TOK_I2C0)
+        elif m == _ROLE_I2C1_SDA:
+            i2c_sda.append(_IN2 + i.tok + _TOK_I2C1)
+        elif m == _ROLE_I2C0_SCL:
+            i2c_scl.append(_TOK_I2C0_PAIR + i.tok + _TOK_PAIR_END)
+        elif m == _ROLE_I2C1_SCL:
+            i2c_scl.append(_TOK_I2C1_PAIR + i.tok + _TOK_PAIR_END)
+        m = i.roles_mask & _ROLE_SPI
+        if m == _ROLE_SPI0_TX:
+            spi_tx.append(_IN2 + i.tok + _TOK_SPI0)
+        elif m == _ROLE_SPI1_TX:
+            spi_tx.append(_IN2 + i.tok + _TOK_SPI1)
+        elif m == _ROLE_SPI0_SCK:
+            spi_scl.append(_TOK_SPI0_PAIR + i.tok + _TOK_PAIR_END)
+        elif m == _ROLE_SPI1_SCK:
+            spi_scl.append(_TOK_SPI1_PAIR + i.tok + _TOK_PAIR_END)
+        elif m == _ROLE_SPI0_RX:
+            spi_rx.append(_TOK_SPI0_SOME + i.tok + _TOK_SOME_END)
+        elif m == _ROLE_SPI1_RX:
+            spi_rx.append(_TOK_SPI1_SOME + i.tok + _TOK_SOME_END)
+        elif m == _ROLE_SPI0_CS:
+            spi_cs.append(_TOK_SPI0_SOME + i.tok + _TOK_SOME_END)
+        elif m == _ROLE_SPI1_CS:
+            spi_cs.append(_TOK_SPI1_SOME + i.tok + _TOK_SOME_END)
+        m = i.roles_mask & _ROLE_UART
+        if m == _ROLE_UART0_TX:
+            uart_tx.append(_IN2 + i.tok + _TOK_UART0)
+        elif m == _ROLE_UART1_TX:
+            uart_tx.append(_IN2 + i.tok + _TOK_UART1)
+        elif m == _ROLE_UART0_RX:
+            uart_rx.append(_TOK_UART0_PAIR + i.tok + _TOK_PAIR_END)
+        elif m == _ROLE_UART1_RX:
+            uart_rx.append(_TOK_UART1_PAIR + i.tok + _TOK_PAIR_END)
+        elif m == _ROLE_UART0_CTS:
+            uart_cts.append(_TOK_UART0_SOME + i.tok + _TOK_SOME_END)
+        elif m == _ROLE_UART1_CTS:
+            uart_cts.append(_TOK_UART1_SOME + i.tok + _TOK_SOME_END)
+        elif m == _ROLE_UART0_RTS:
+            uart_rts.append(_TOK_UART0_SOME + i.tok + _TOK_SOME_END)
+        elif m == _ROLE_UART1_RTS:
+            uart_rts.append(_TOK_UART1_SOME + i.tok + _TOK_SOME_END)
+    pwm.append(_IN1)
+    for v in (
+        i2c_sda,
+        i2c_scl,
+        spi_tx,
+        spi_scl,
+        spi_rx,
+        spi_cs,
+        uart_tx,
+        uart_rx,
+        uart_cts,
+        uart_rts,
+    ):
+        v.append(_IN2)
+    return {
+        "tag": [tag],
+        "name": [name],
+        "pwm": pwm,
+        "pins": pid,
+        "i2c_sda": i2c_sda,
+        "i2c_scl": i2c_scl,
+        "spi_tx": spi_tx,
+        "spi_scl": spi_scl,
+        "spi_rx": spi_rx,
+        "spi_cs": spi_cs,
+        "uart_tx": uart_tx,
+        "uart_rx": uart_rx,
+        "uart_cts": uart_cts,
+        "uart_rts": uart_rts,
+    }
 
 
 def _pins(v, start):
     c, p, g = list(), list(), dict()
     for x in range(start, len(v)):
-        if len(v[x]) == 0:
-            continue
         if v[x].startswith("//"):
             c.append(_strip_comment(v[x]).strip())
             continue
@@ -318,128 +382,36 @@ def _pins(v, start):
         r = v[x][i + 1 :].strip()
         if r == "-":
             e = None
-        elif "," in r:
-            e = [k.strip() for k in r.split(",")]
         else:
-            e = [k.strip() for k in r.split(" ")]
-        del r, i
+            e = _RX_ROLE_SEP.split(r)
         p.append(Pin(n, c, e))
         c.clear()
-        del n, e
-    del c, g
     return p
 
 
-def _make_uart(pins):
-    a, b, c, d = StringIO(), StringIO(), StringIO(), StringIO()
-    try:
-        for i in pins:
-            if "UART0_TX" in i.roles:
-                a.write(f"{_in(2)}PinID::Pin{i.id} => UartID::Uart0,\n")
-            if "UART1_TX" in i.roles:
-                a.write(f"{_in(2)}PinID::Pin{i.id} => UartID::Uart1,\n")
-            if "UART0_RX" in i.roles:
-                b.write(f"{_in(2)}(UartID::Uart0, PinID::Pin{i.id}) => (),\n")
-            if "UART1_RX" in i.roles:
-                b.write(f"{_in(2)}(UartID::Uart1, PinID::Pin{i.id}) => (),\n")
-            if "UART0_CTS" in i.roles:
-                c.write(f"{_in(2)}(UartID::Uart0, Some(PinID::Pin{i.id})) => (),\n")
-            if "UART1_CTS" in i.roles:
-                c.write(f"{_in(2)}(UartID::Uart1, Some(PinID::Pin{i.id})) => (),\n")
-            if "UART0_RTS" in i.roles:
-                d.write(f"{_in(2)}(UartID::Uart0, Some(PinID::Pin{i.id})) => (),\n")
-            if "UART1_RTS" in i.roles:
-                d.write(f"{_in(2)}(UartID::Uart1, Some(PinID::Pin{i.id})) => (),\n")
-        a.write(_in(2))
-        b.write(_in(2))
-        c.write(_in(2))
-        d.write(_in(2))
-        return CODE_UART.format(
-            uart_tx=a.getvalue(),
-            uart_rx=b.getvalue(),
-            uart_cts=c.getvalue(),
-            uart_rts=d.getvalue(),
-        )
-    finally:
-        a.close()
-        b.close()
-        c.close()
-        d.close()
-        del a, b, c, d
-
-
-def _make_pins(pins):
-    a = StringIO()
-    try:
-        for i in pins:
-            if isinstance(i.doc, list) and len(i.doc) > 0:
-                for v in i.doc:
-                    a.write(f"{_in(1)}/// {v}\n")
-            a.write(f"{_in(1)}Pin{i.id} = 0x{hex(i.id)[2:].upper()}u8,\n")
-        return CODE_PINS.format(pins=a.getvalue())
-    finally:
-        a.close()
-        del a
-
-
 def _strip_comment(v):
-    for x in range(0, len(v)):
-        i = ord(v[x])
-        if i == 0x2F or i == 0x20:
-            continue
-        del i
-        return v[x:]
-    return v
+    r = v.lstrip("/ ")
+    # Lines that are only '/' and ' ' are kept as-is.
+    if len(r) == 0:
+        return v
+    return r
 
 
 def _check_ascii(v, strict=False):
     # Strict  : A-Za-z0-9_-
     #  Cannot start with a number or '_' or '-'
     # Regular : A-Za-z0-9_- [](){}@|
-    if len(v) <= 1:
-        return False
-    # Strict entries cannot start with a number.
     if strict:
-        n = ord(v[0])
-        if 0x30 <= n <= 0x39 or n == 0x5F or n == 0x2D:
-            return False
-        del n
-    for i in v:
-        n = ord(i)
-        # a-z
-        if 0x61 <= n <= 0x7A:
-            continue
-        # A-Z
-        if 0x41 <= n <= 0x5A:
-            continue
-        # 0-9
-        if 0x30 <= n <= 0x39:
-            continue
-        # _ -
-        if n == 0x5F or n == 0x2D:
-            continue
-        if strict:
-            return False
-        # [sp] [ ] |
-        if n == 0x20 or n == 0x5B or n == 0x5D or n == 0x7C:
-            continue
-        # { } ( ) @
-        if n == 0x7B or n == 0x7D or n == 0x28 or n == 0x29 or n == 0x40:
-            continue
-        return False
-    return True
+        return _RX_STRICT.fullmatch(v) is not None
+    return _RX_REGULAR.fullmatch(v) is not None
 
 
-def format_device(name, tag, pins):
-    return CODE.format(
-        tag=tag,
-        name=name,
-        pwm=_make_pwm(pins),
-        i2c=_make_i2c(pins),
-        spi=_make_spi(pins),
-        pins=_make_pins(pins),
-        uart=_make_uart(pins),
-    )
+def write_device(name, tag, pins, fp):
+    v = _emit_all(name, tag, pins)
+    for s, n in _DEVICE:
+        fp.write(s)
+        if n is not None:
+            fp.writelines(v[n])
 
 
 def make_code_files(layout_dir, boards_dir):
@@ -451,44 +423,43 @@ def make_code_files(layout_dir, boards_dir):
         raise ValueError(f'layout directory "{layout_dir}" is not a directory')
     if not isdir(boards_dir):
         raise ValueError(f'boards directory "{boards_dir}" is not a directory')
-    d = glob(join(layout_dir, "*.layout"))
+    d = [
+        e.path
+        for e in scandir(layout_dir)
+        if e.is_file()
+        and e.name.endswith(".layout")
+        and not e.name.startswith(".")
+    ]
     if len(d) == 0:
         raise ValueError(f'no layouts found in "{layout_dir}"')
-    b, c, u = StringIO(), StringIO(), dict()
-    try:
-        b.write(CODE_LIB)
-        for i in d:
-            try:
-                print(f'Processing "{i}"..')
-                n, t, p = parse(i)
-                if t == "lib":
-                    raise ValueError(f'invalid tag name "{t}" in "{i}"')
-                if t in u:
-                    raise ValueError(f'duplicate tag name "{t}" in "{i}"')
-                u[t] = True
-                with open(join(boards_dir, f"{t}.rs"), "w") as f:
-                    f.write(format_device(n, t, p))
-                del p
-                b.write(
-                    f'\n#[cfg(feature = "{t}")]\npub mod {t};\n'
-                    f'#[cfg(feature = "{t}")]\npub use {t} as pins;\n'
-                )
-                print(f'Processed "{n}" [{t}] from "{i}".')
-                c.write(f"{t} = []\n")
-                del n, t
-            except (ValueError, OSError) as err:
-                raise ValueError(f'error in "{i}": {err}')
-        p = join(boards_dir, "lib.rs")
-        print(f'Writing final "{p}"..')
-        with open(p, "w") as f:
-            f.write(b.getvalue())
-        del p
-        print('Done! Make sure the following entries are in the "Cargo.toml" file:')
-        print(f"\n{c.getvalue()}")
-    finally:
-        b.close()
-        c.close()
-        del b, c, u
+    u = dict()
+    for i in d:
+        try:
+            print(f'Processing "{i}"..')
+            n, t, p = parse(i)
+            if t == "lib":
+                raise ValueError(f'invalid tag name "{t}" in "{i}"')
+            if t in u:
+                raise ValueError(f'duplicate tag name "{t}" in "{i}"')
+            u[t] = True
+            with open(join(boards_dir, f"{t}.rs"), "w") as f:
+                write_device(n, t, p, f)
+            print(f'Processed "{n}" [{t}] from "{i}".')
+        except (ValueError, OSError) as err:
+            raise ValueError(f'error in "{i}": {err}')
+    p = join(boards_dir, "lib.rs")
+    print(f'Writing final "{p}"..')
+    with open(p, "w") as f:
+        f.write(CODE_LIB)
+        for t in u:
+            f.write(
+                f'\n#[cfg(feature = "{t}")]\npub mod {t};\n'
+                f'#[cfg(feature = "{t}")]\npub use {t} as pins;\n'
+            )
+    print('Done! Make sure the following entries are in the "Cargo.toml" file:\n')
+    for t in u:
+        print(f"{t} = []")
+    print()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+
+from io import StringIO
+from sys import path
+from shutil import copyfile
+from os import listdir, makedirs
+from unittest import TestCase, main
+from contextlib import redirect_stdout
+from tempfile import TemporaryDirectory
+from os.path import join, dirname, abspath
+
+path.insert(0, dirname(abspath(__file__)))
+
+import generate  # noqa: E402
+
+_DATA = join(dirname(abspath(__file__)), "data")
+_BOARDS = join(dirname(dirname(abspath(__file__))), "src", "pin", "boards")
+_HEADER = "Test Board\n#test\n"
+_PINS = "1: -\n2: -\n"
+
+# Error messages returned by the original generator for each malformed layout.
+_ERRORS = [
+    (_HEADER + "0: I2C0_SDA, BAD\n" + _PINS, 'pin "0" has an invalid role "BAD"'),
+    (
+        _HEADER + "0: I2C0_SDA I2C1_SCL bad\n" + _PINS,
+        'pin "0" has an invalid role "BAD"',
+    ),
+    (
+        _HEADER + "0: I2C0_SDA, I2C1_SCL\n" + _PINS,
+        'pin "0" can only have a single I2C role',
+    ),
+    (
+        _HEADER + "0: SPI0_TX, SPI0_TX\n" + _PINS,
+        'pin "0" can only have a single SPI role',
+    ),
+    (
+        _HEADER + "0: UART0_TX UART0_RX I2C0_SDA I2C1_SDA\n" + _PINS,
+        'pin "0" can only have a single I2C role',
+    ),
+    (
+        _HEADER + "0: I2C0_SDA\tSPI0_RX\n" + _PINS,
+        'pin "0" has an invalid role "I2C0_SDA\tSPI0_RX"',
+    ),
+    (
+        _HEADER + "0: I2C0_SDA\x0bSPI0_RX\n" + _PINS,
+        'pin "0" has an invalid role "I2C0_SDA\x0bSPI0_RX"',
+    ),
+    (_HEADER + "0: -\n0: -\n2: -\n", 'duplicate pin ID "0"'),
+    (_HEADER + "x0: -\n" + _PINS, 'invalid pin ID "x0"'),
+    (_HEADER + "0: -\nfoo\n2: -\n", 'invalid pin line entry "foo"'),
+    ("Test$Board\n#test\n0: -\n" + _PINS, 'name value "Test$Board" is not valid'),
+    ("Test Board\n#1test\n0: -\n" + _PINS, 'tag value "1test" is not valid'),
+    ("Test Board\n0: -\n" + _PINS + "3: -\n", "#<tag> entry was not found"),
+]
+
+
+class TestGenerate(TestCase):
+    def _parse(self, d, v):
+        p = join(d, "test.layout")
+        with open(p, "w", encoding="UTF-8") as f:
+            f.write(v)
+        return generate.parse(p)
+
+    def test_layouts(self):
+        with TemporaryDirectory() as d, redirect_stdout(StringIO()):
+            generate.make_code_files(_DATA, d)
+            for n in ("pico", "tiny2040", "xiao2040"):
+                with open(join(d, f"{n}.rs")) as f:
+                    v = f.read()
+                with open(join(_BOARDS, f"{n}.rs")) as f:
+                    self.assertEqual(v, f.read(), n)
+            # Board order in "lib.rs" follows the directory listing order.
+            with open(join(d, "lib.rs")) as f:
+                v = sorted(f.read().split("\n"))
+            with open(join(_BOARDS, "lib.rs")) as f:
+                self.assertEqual(v, sorted(f.read().split("\n")))
+
+    def test_hidden_layouts(self):
+        with TemporaryDirectory() as d, redirect_stdout(StringIO()):
+            s, o = join(d, "data"), join(d, "out")
+            makedirs(s)
+            copyfile(join(_DATA, "pico.layout"), join(s, "pico.layout"))
+            with open(join(s, "._pico.layout"), "wb") as f:
+                f.write(b"\x00\x05\x16\x07\xff\xfe")
+            generate.make_code_files(s, o)
+            self.assertEqual(sorted(listdir(o)), ["lib.rs", "pico.rs"])
+
+    def test_errors(self):
+        with TemporaryDirectory() as d:
+            for v, e in _ERRORS:
+                with self.subTest(layout=v):
+                    with self.assertRaises(ValueError) as c:
+                        self._parse(d, v)
+                    self.assertEqual(str(c.exception), e)
+
+    def test_line_breaks(self):
+        with TemporaryDirectory() as d:
+            _, _, p = self._parse(d, f"{_HEADER}// a\u2028b\n0: -\r\n{_PINS}")
+            self.assertEqual(p[0].doc, ["a\u2028b"])
+            self.assertEqual([i.id for i in p], [0, 1, 2])
+
+    def test_role_separators(self):
+        with TemporaryDirectory() as d:
+            for v in ("I2C0_SDA,\tSPI0_RX", "I2C0_SDA \tSPI0_RX", "i2c0_sda  spi0_rx"):
+                with self.subTest(roles=v):
+                    _, _, p = self._parse(d, f"{_HEADER}0: {v}\n{_PINS}")
+                    self.assertEqual(
+                        p[0].roles_mask,
+                        generate._ROLE_I2C0_SDA | generate._ROLE_SPI0_RX,
+                    )
+
+
+if __name__ == "__main__":
+    main()